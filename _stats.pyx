@@ -0,0 +1,166 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# distutils: extra_compile_args = -O3 -march=native
+"""Optional C-level repository line counter used by github_repo_stats.py.
+
+Build it in place with `cythonize -i _stats.pyx`. Only POSIX systems are supported.
+"""
+
+from libc.stdlib cimport malloc, free
+from libc.string cimport memchr, strcmp, strlen, strrchr
+from posix.fcntl cimport open as c_open, O_RDONLY
+from posix.unistd cimport read, close
+from posix.stat cimport struct_stat, lstat, S_ISDIR
+
+
+cdef extern from "dirent.h" nogil:
+    ctypedef struct DIR:
+        pass
+
+    cdef struct dirent:
+        unsigned char d_type
+        char d_name[256]
+
+    DIR *opendir(const char *name)
+    dirent *readdir(DIR *dirp)
+    int closedir(DIR *dirp)
+
+    enum:
+        DT_UNKNOWN
+        DT_DIR
+
+
+cdef enum:
+    # Size of the blocks read when counting lines
+    READ_CHUNK_SIZE = 1 << 20
+    # Longest extension looked up; longer suffixes can't match a known language
+    MAX_EXT_LEN = 16
+
+
+cdef long long _count_file(const char *path, char *buf) nogil:
+    """Count the lines in a file, or return -1 if it can't be read or is binary."""
+    cdef int fd = c_open(path, O_RDONLY)
+    if fd < 0:
+        return -1
+
+    cdef long long line_count = 0
+    cdef char last = b'\n'
+    cdef Py_ssize_t n
+    cdef const char *p
+    cdef const char *end
+
+    while True:
+        n = read(fd, buf, READ_CHUNK_SIZE)
+        if n < 0:
+            close(fd)
+            return -1
+        if n == 0:
+            break
+
+        # Skip binary files, like the Python counter does
+        if memchr(buf, 0, n) != NULL:
+            close(fd)
+            return -1
+
+        p = buf
+        end = buf + n
+        while True:
+            p = <const char *>memchr(p, b'\n', end - p)
+            if p == NULL:
+                break
+            line_count += 1
+            p += 1
+        last = buf[n - 1]
+
+    close(fd)
+
+    # A final line without a trailing newline still counts as a line
+    if last != b'\n':
+        line_count += 1
+    return line_count
+
+
+def count_repo(bytes root, dict ext_to_id, exclude_dirs, int num_languages):
+    """Walk root and return a list of line totals indexed by language id.
+
+    ext_to_id maps lower-case extensions (as bytes, including the dot) to language ids.
+    Directories whose names are in exclude_dirs (as bytes) are skipped.
+    """
+    totals = [0] * num_languages
+    stack = [root]
+
+    cdef char *buf = <char *>malloc(READ_CHUNK_SIZE)
+    if buf == NULL:
+        raise MemoryError()
+
+    cdef DIR *dirp
+    cdef dirent *entry
+    cdef struct_stat st
+    cdef const char *name
+    cdef const char *dot
+    cdef char ext[MAX_EXT_LEN + 1]
+    cdef Py_ssize_t ext_len, i
+    cdef bint is_dir
+    cdef long long line_count
+    cdef bytes dir_path, entry_path
+
+    # Directories already queued, keyed by (device, inode), so bind mounts and other
+    # aliases of the same directory are only walked once
+    seen_dirs = set()
+    if lstat(root, &st) == 0:
+        seen_dirs.add((st.st_dev, st.st_ino))
+
+    try:
+        while stack:
+            dir_path = stack.pop()
+            dirp = opendir(dir_path)
+            if dirp == NULL:
+                # Skip directories that can't be read
+                continue
+
+            try:
+                while True:
+                    entry = readdir(dirp)
+                    if entry == NULL:
+                        break
+                    name = entry.d_name
+                    if strcmp(name, b".") == 0 or strcmp(name, b"..") == 0:
+                        continue
+
+                    entry_path = dir_path + b"/" + name
+
+                    # Use the type cached by readdir; only stat when it isn't known
+                    if entry.d_type == DT_UNKNOWN:
+                        is_dir = lstat(entry_path, &st) == 0 and S_ISDIR(st.st_mode)
+                    else:
+                        is_dir = entry.d_type == DT_DIR
+
+                    if is_dir:
+                        if name not in exclude_dirs and lstat(entry_path, &st) == 0:
+                            dir_key = (st.st_dev, st.st_ino)
+                            if dir_key not in seen_dirs:
+                                seen_dirs.add(dir_key)
+                                stack.append(entry_path)
+                        continue
+
+                    # Look up the extension directly; leading-dot names have none
+                    dot = strrchr(name, b'.')
+                    if dot == NULL or dot == name:
+                        continue
+                    ext_len = strlen(dot)
+                    if ext_len > MAX_EXT_LEN:
+                        continue
+                    for i in range(ext_len):
+                        ext[i] = dot[i] + 32 if b'A' <= dot[i] <= b'Z' else dot[i]
+                    language_id = ext_to_id.get(ext[:ext_len])
+                    if language_id is None:
+                        continue
+
+                    line_count = _count_file(entry_path, buf)
+                    if line_count >= 0:
+                        totals[language_id] += line_count
+            finally:
+                closedir(dirp)
+    finally:
+        free(buf)
+
+    return totals
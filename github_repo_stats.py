@@ -7,26 +7,68 @@ import shutil
 import tempfile
 import re
 import fnmatch
+import heapq
+import hashlib
+import json
 from urllib.parse import urlparse
 from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
 import pathspec
 import argparse
+import mmap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    from _stats import count_repo
+except ImportError:
+    count_repo = None
+
+
+# Size of the blocks read when counting lines
+READ_CHUNK_SIZE = 1 << 20
+
+# Files with a NUL byte in their first block are treated as binary and skipped
+BINARY_SNIFF_SIZE = 8192
+
+# Files at least this large are memory-mapped and counted with NumPy when available
+MMAP_THRESHOLD = 1 << 20
+
+# Number of paths passed to each external line-counting command
+EXTERNAL_COUNT_BATCH_SIZE = 1000
+
+# Counting at least this many bytes in-process uses a process pool instead of threads
+PROCESS_POOL_MIN_BYTES = 200 << 20
+
+# Number of paths sent to a worker process at a time
+PROCESS_POOL_CHUNK_SIZE = 64
 
 
 def validate_github_url(url):
-    """Validate if the provided URL is a GitHub repository URL."""
+    """Validate a GitHub repository URL, returning the parsed URL or None if it's invalid."""
     parsed_url = urlparse(url)
     
     # Check if the domain is github.com
     if parsed_url.netloc != "github.com":
-        return False
+        return None
     
     # Check if the path has at least two components (username/repo)
     path_parts = [part for part in parsed_url.path.split('/') if part]
     if len(path_parts) < 2:
-        return False
+        return None
     
-    return True
+    return parsed_url
 
 
 def is_local_path(path):
@@ -36,8 +78,24 @@ def is_local_path(path):
 
 def clone_repository(url, temp_dir):
     """Clone the GitHub repository to a temporary directory."""
+    # Only the current tree is analyzed, so skip history and fetch blobs lazily
+    shallow_args = ["--depth", "1", "--single-branch"]
+    try:
+        subprocess.run(["git", "clone", *shallow_args, "--filter=blob:none", url, temp_dir], 
+                      check=True, 
+                      stdout=subprocess.PIPE, 
+                      stderr=subprocess.PIPE)
+        return True
+    except subprocess.CalledProcessError as e:
+        # Only retry without the filter if the server rejected partial clone
+        stderr = e.stderr.decode('utf-8', errors='ignore').lower()
+        if 'filter' not in stderr and 'partial clone' not in stderr:
+            print(f"Error cloning repository: {e}")
+            return False
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
     try:
-        subprocess.run(["git", "clone", url, temp_dir], 
+        subprocess.run(["git", "clone", *shallow_args, url, temp_dir], 
                       check=True, 
                       stdout=subprocess.PIPE, 
                       stderr=subprocess.PIPE)
@@ -64,68 +122,448 @@ def parse_gitignore(repo_dir):
     )
 
 
-def should_exclude_path(path, exclude_patterns, repo_dir, gitignore_spec=None):
-    """Check if a path should be excluded based on patterns or gitignore rules."""
+def compile_exclude_patterns(exclude_patterns):
+    """Combine glob exclusion patterns into a single compiled regex."""
+    if not exclude_patterns:
+        return None
+    
+    combined = '|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in exclude_patterns)
+    return re.compile(combined)
+
+
+def should_exclude_path(rel_path, exclude_regex, gitignore_spec=None):
+    """Check if a repo-relative path should be excluded based on patterns or gitignore rules."""
     # First, check if path is excluded by explicit patterns
-    if exclude_patterns:
-        rel_path = os.path.relpath(path, repo_dir)
-        for pattern in exclude_patterns:
-            if fnmatch.fnmatch(rel_path, pattern):
-                return True
+    if exclude_regex and exclude_regex.match(rel_path):
+        return True
     
     # Then, check if path is excluded by gitignore rules
-    if gitignore_spec:
-        rel_path = os.path.relpath(path, repo_dir)
-        if gitignore_spec.match_file(rel_path):
-            return True
+    if gitignore_spec and gitignore_spec.match_file(rel_path):
+        return True
     
     return False
 
 
-def get_language_stats(repo_dir, verbose=False, include_docs=False, exclude_patterns=None, respect_gitignore=True):
-    """Calculate lines of code statistics by language."""
-    # Define code and documentation file extensions
-    code_extensions = {
-        '.py': 'Python',
-        '.js': 'JavaScript',
-        '.jsx': 'JavaScript',
-        '.ts': 'TypeScript',
-        '.tsx': 'TypeScript',
-        '.html': 'HTML',
-        '.css': 'CSS',
-        '.scss': 'SCSS',
-        '.sass': 'SASS',
-        '.java': 'Java',
-        '.c': 'C',
-        '.cpp': 'C++',
-        '.cs': 'C#',
-        '.go': 'Go',
-        '.rb': 'Ruby',
-        '.php': 'PHP',
-        '.swift': 'Swift',
-        '.kt': 'Kotlin',
-        '.rs': 'Rust',
-        '.sh': 'Shell',
-        '.json': 'JSON',
-        '.xml': 'XML',
-        '.yml': 'YAML',
-        '.yaml': 'YAML',
-    }
-    
-    # Define documentation file extensions
-    doc_extensions = {
-        '.md': 'Markdown',
-        '.rst': 'ReStructuredText',
-        '.txt': 'Text',
-    }
+def _iter_code_files(root, exclude_dirs, exclude_regex, language_extensions, gitignore_spec=None):
+    """Yield (path, rel_path, language_id) for each code file under root, using os.scandir."""
+    # Track each directory's path relative to root so it never has to be recomputed
+    stack = [(root, '')]
+    
+    # Directories already queued, keyed by (device, inode), so bind mounts and other
+    # aliases of the same directory are only walked once
+    seen_dirs = set()
+    try:
+        root_stat = os.stat(root)
+        seen_dirs.add((root_stat.st_dev, root_stat.st_ino))
+    except OSError:
+        pass
+    
+    # Bind hot lookups to locals for the per-entry loop
+    scandir = os.scandir
+    lstat = os.lstat
+    push = stack.append
+    get_language = language_extensions.get
+    is_excluded = should_exclude_path
+    
+    while stack:
+        current_dir, rel_dir = stack.pop()
+        try:
+            with scandir(current_dir) as it:
+                for entry in it:
+                    rel_path = rel_dir + entry.name
+                    
+                    if entry.is_dir(follow_symlinks=False):
+                        # Skip excluded directories
+                        if (entry.name not in exclude_dirs and
+                                not is_excluded(rel_path, exclude_regex, gitignore_spec)):
+                            # DirEntry.stat() reports no device or inode on Windows, so lstat the path
+                            try:
+                                dir_stat = lstat(entry.path)
+                            except OSError:
+                                continue
+                            dir_key = (dir_stat.st_dev, dir_stat.st_ino)
+                            if dir_key not in seen_dirs:
+                                seen_dirs.add(dir_key)
+                                push((entry.path, rel_path + '/'))
+                        continue
+                    
+                    # Look up the extension directly; leading-dot names have none
+                    name = entry.name
+                    dot = name.rfind('.')
+                    if dot <= 0:
+                        continue
+                    language_id = get_language(name[dot:].lower())
+                    if language_id is None:
+                        continue
+                    
+                    # Skip excluded files
+                    if is_excluded(rel_path, exclude_regex, gitignore_spec):
+                        continue
+                    
+                    yield entry.path, rel_path, language_id
+        except OSError:
+            # Skip directories that can't be read
+            pass
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_newlines(buf):
+        """Count newline bytes in a uint8 array (compiled with Numba)."""
+        n = 0
+        for i in range(buf.shape[0]):
+            n += buf[i] == 10
+        return n
+else:
+    _count_newlines = None
+
+
+def _count_lines_mmap(f):
+    """Count the lines in a large open file by memory-mapping it into NumPy."""
+    line_count = 0
+    is_binary = False
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+        size = data.shape[0]
+        
+        # Scan in fixed-size slices so temporaries stay bounded, checking each for NUL
+        # bytes in the same pass to skip binary files, like the buffered path does
+        for start in range(0, size, READ_CHUNK_SIZE):
+            end = min(start + READ_CHUNK_SIZE, size)
+            if mm.find(b'\x00', start, end) != -1:
+                is_binary = True
+                break
+            
+            if _count_newlines is not None:
+                line_count += int(_count_newlines(data[start:end]))
+            else:
+                line_count += int(np.count_nonzero(data[start:end] == 0x0A))
+        
+        ends_with_newline = data[-1] == 0x0A
+        
+        # Release the array view before the mapping is closed
+        del data
+    
+    if is_binary:
+        return None
+    
+    # A final line without a trailing newline still counts as a line
+    if not ends_with_newline:
+        line_count += 1
+    return line_count
+
+
+def _count_lines(file_path):
+    """Count the lines in a file, or return None if it can't be read or is binary."""
+    try:
+        # Count newlines on raw bytes; decoding the file is never needed
+        with open(file_path, 'rb') as f:
+            # Sniff the start of the file for NUL bytes before reading the rest
+            head = f.read(BINARY_SNIFF_SIZE)
+            if b'\x00' in head:
+                return None
+            
+            if np is not None and len(head) == BINARY_SNIFF_SIZE:
+                try:
+                    if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+                        return _count_lines_mmap(f)
+                except (OSError, ValueError):
+                    # Fall back to buffered reads below
+                    pass
+            
+            line_count = head.count(b'\n')
+            last_chunk = head
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if b'\x00' in chunk:
+                    return None
+                line_count += chunk.count(b'\n')
+                last_chunk = chunk
+    except OSError:
+        return None
+    
+    # A final line without a trailing newline still counts as a line
+    if last_chunk and not last_chunk.endswith(b'\n'):
+        line_count += 1
+    return line_count
+
+
+def _run_external_count(file_paths):
+    """Run grep to count the lines in a batch of files, returning the completed process."""
+    # `grep -c ''` counts a final line without a trailing newline, like _count_lines;
+    # -I gives binary files a count of 0 instead of counting their lines
+    command = ['grep', '-I', '-c', '-H', '', '--', *file_paths]
+    return subprocess.run(command,
+                          stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL,
+                          env=dict(os.environ, LC_ALL='C'))
+
+
+@lru_cache(maxsize=None)
+def _can_count_externally():
+    """Check once whether the external line counter is available and supports our flags."""
+    if os.name == 'nt' or not shutil.which('grep'):
+        return False
+    
+    # Not every grep (e.g. busybox) supports -I; a working one reports 0 lines for an empty file
+    try:
+        result = _run_external_count([os.devnull])
+    except OSError:
+        return False
+    return result.returncode <= 1 and result.stdout == os.fsencode(f'{os.devnull}:0\n')
+
+
+def _count_lines_external(file_paths):
+    """Count the lines in a batch of files with grep, or return None if it can't be run.
+    
+    Returns a list aligned with file_paths, with None for files that couldn't be read.
+    """
+    try:
+        result = _run_external_count(file_paths)
+    except OSError:
+        return None
     
+    # Unreadable files are reported on stderr and simply missing from the output
+    line_counts = {}
+    for line in result.stdout.splitlines():
+        path, _, count = line.rpartition(b':')
+        try:
+            line_counts[os.fsdecode(path)] = int(count)
+        except ValueError:
+            continue
+    
+    # Exit status 2 also covers unreadable files, so only treat it as a failure
+    # when grep produced no counts at all
+    if result.returncode > 1 and not line_counts:
+        return None
+    
+    return [line_counts.get(file_path) for file_path in file_paths]
+
+
+def _count_lines_batch(file_paths):
+    """Count the lines in a batch of files, preferring the external counter."""
+    line_counts = _count_lines_external(file_paths)
+    if line_counts is None:
+        line_counts = [_count_lines(file_path) for file_path in file_paths]
+    return line_counts
+
+
+# Code file extensions and the language they map to
+CODE_EXTENSIONS = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.jsx': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.tsx': 'TypeScript',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.scss': 'SCSS',
+    '.sass': 'SASS',
+    '.java': 'Java',
+    '.c': 'C',
+    '.cpp': 'C++',
+    '.cs': 'C#',
+    '.go': 'Go',
+    '.rb': 'Ruby',
+    '.php': 'PHP',
+    '.swift': 'Swift',
+    '.kt': 'Kotlin',
+    '.rs': 'Rust',
+    '.sh': 'Shell',
+    '.json': 'JSON',
+    '.xml': 'XML',
+    '.yml': 'YAML',
+    '.yaml': 'YAML',
+}
+
+# Documentation file extensions, only counted when requested
+DOC_EXTENSIONS = {
+    '.md': 'Markdown',
+    '.rst': 'ReStructuredText',
+    '.txt': 'Text',
+}
+
+# Languages are identified by their index in LANGUAGES while counting
+LANGUAGES = sorted(set(CODE_EXTENSIONS.values()) | set(DOC_EXTENSIONS.values()))
+LANGUAGE_IDS = {language: i for i, language in enumerate(LANGUAGES)}
+
+# Directories that are never analyzed
+EXCLUDE_DIRS = {'.git', 'node_modules', 'venv', 'env', '__pycache__', 'dist', 'build'}
+
+
+def get_language_extensions(include_docs=False):
+    """Return the mapping of extensions to analyze to their language ids."""
     # Combine extensions based on user preference
-    language_extensions = code_extensions.copy()
+    language_extensions = CODE_EXTENSIONS.copy()
     if include_docs:
-        language_extensions.update(doc_extensions)
+        language_extensions.update(DOC_EXTENSIONS)
+    return {ext: LANGUAGE_IDS[language] for ext, language in language_extensions.items()}
+
+
+def get_cache_path(repo_dir):
+    """Return the path of the line count cache file for a directory."""
+    cache_root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    repo_hash = hashlib.sha256(os.fsencode(os.path.abspath(repo_dir))).hexdigest()[:16]
+    return os.path.join(cache_root, 'github_repo_stats', f'{repo_hash}.json')
+
+
+def load_line_count_cache(repo_dir):
+    """Load the cached line counts for a directory, or an empty cache if there are none."""
+    try:
+        with open(get_cache_path(repo_dir), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_line_count_cache(repo_dir, cache):
+    """Persist the line count cache for a directory, ignoring write failures."""
+    cache_path = get_cache_path(repo_dir)
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The cache is only an optimization
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _cache_key(file_path):
+    """Return the cache key identifying a file's current contents, or None if it can't be read."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _count_files(pool, file_paths, verbose=False):
+    """Count the lines in each file on the pool, returning a list aligned with file_paths."""
+    if not verbose and _can_count_externally():
+        # Only totals are needed, so delegate counting to grep in batches
+        batches = [file_paths[i:i + EXTERNAL_COUNT_BATCH_SIZE]
+                   for i in range(0, len(file_paths), EXTERNAL_COUNT_BATCH_SIZE)]
+        return list(chain.from_iterable(pool.map(_count_lines_batch, batches)))
+    
+    return list(pool.map(_count_lines, file_paths, chunksize=PROCESS_POOL_CHUNK_SIZE))
+
+
+def _should_use_processes(file_paths, verbose=False):
+    """Decide whether in-process counting is large enough to be worth a process pool."""
+    # grep batches already run in separate processes, and one core gains nothing
+    if (os.cpu_count() or 1) <= 1 or (not verbose and _can_count_externally()):
+        return False
+    
+    # Worker startup only pays off once there is a lot of data to scan
+    total_bytes = 0
+    for file_path in file_paths:
+        try:
+            total_bytes += os.stat(file_path).st_size
+        except OSError:
+            continue
+        if total_bytes >= PROCESS_POOL_MIN_BYTES:
+            return True
+    return False
+
+
+def _count_code_files(pool, code_files, verbose=False, line_count_cache=None):
+    """Count the lines in (path, rel_path, language_id) entries on the pool, using the cache if given."""
+    file_paths = [file_path for file_path, _, _ in code_files]
+    
+    if line_count_cache is None:
+        return _count_files(pool, file_paths, verbose)
+    
+    # Reuse counts for files whose mtime and size haven't changed
+    cache_keys = list(pool.map(_cache_key, file_paths, chunksize=PROCESS_POOL_CHUNK_SIZE))
+    line_counts = []
+    for (_, rel_path, _), cache_key in zip(code_files, cache_keys):
+        # Entries are [cache_key, line_count]; ignore anything malformed
+        cached = line_count_cache.get(rel_path)
+        hit = (cache_key is not None and
+               isinstance(cached, list) and len(cached) == 2 and
+               cached[0] == cache_key and type(cached[1]) is int)
+        line_counts.append(cached[1] if hit else None)
+    
+    misses = [i for i, line_count in enumerate(line_counts) if line_count is None]
+    miss_counts = _count_files(pool, [file_paths[i] for i in misses], verbose)
+    for i, line_count in zip(misses, miss_counts):
+        line_counts[i] = line_count
+    
+    # Rebuild the cache from the current files only.
+    # Binary, empty and unreadable files are cheap to recheck, so only cache real counts
+    line_count_cache.clear()
+    for (_, rel_path, _), cache_key, line_count in zip(code_files, cache_keys, line_counts):
+        if line_count and cache_key is not None:
+            line_count_cache[rel_path] = [cache_key, line_count]
     
-    # Define directories to exclude
-    exclude_dirs = {'.git', 'node_modules', 'venv', 'env', '__pycache__', 'dist', 'build'}
+    return line_counts
+
+
+def _collect_stats(code_files, verbose=False, line_count_cache=None):
+    """Count lines in (path, rel_path, language_id) entries and aggregate them by language.
+    
+    If line_count_cache is given, unchanged files reuse their cached counts and the
+    cache is replaced in place with entries for code_files only, so files that were
+    deleted, renamed or excluded are dropped from it.
+    """
+    # Stats collection, accumulated per language id
+    line_totals = [0] * len(LANGUAGES)
+    total_lines = 0
+    file_stats = defaultdict(dict)
+    
+    # Choose the pool before any worker threads exist, so process workers are
+    # started from a single-threaded process
+    line_counts = None
+    if _should_use_processes([file_path for file_path, _, _ in code_files], verbose):
+        try:
+            # Count on all cores without the GIL
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+                line_counts = _count_code_files(pool, code_files, verbose, line_count_cache)
+        except BrokenProcessPool:
+            # Workers can fail to start, e.g. when spawned from an unguarded script;
+            # count on threads instead
+            line_counts = None
+    
+    if line_counts is None:
+        # Count lines concurrently; file reads are I/O-bound and release the GIL
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            line_counts = _count_code_files(pool, code_files, verbose, line_count_cache)
+    
+    for (_, rel_path, language_id), line_count in zip(code_files, line_counts):
+        if line_count is None:
+            # Skip files that can't be read
+            continue
+        
+        line_totals[language_id] += line_count
+        total_lines += line_count
+        
+        if verbose:
+            file_stats[LANGUAGES[language_id]][rel_path] = line_count
+    
+    stats = {LANGUAGES[i]: lines for i, lines in enumerate(line_totals) if lines}
+    
+    if verbose:
+        return stats, total_lines, file_stats
+    return stats, total_lines
+
+
+def get_language_stats(repo_dir, verbose=False, include_docs=False, exclude_patterns=None, respect_gitignore=True,
+                       use_cache=False):
+    """Calculate lines of code statistics by language."""
+    language_extensions = get_language_extensions(include_docs)
+    
+    # Compile exclusion patterns once for the whole traversal
+    exclude_regex = compile_exclude_patterns(exclude_patterns)
     
     # Parse .gitignore if present and requested
     gitignore_spec = None
@@ -134,87 +572,145 @@ def get_language_stats(repo_dir, verbose=False, include_docs=False, exclude_patt
         if gitignore_spec:
             print("Using .gitignore rules to exclude files")
     
-    # Stats collection
-    stats = defaultdict(int)
-    total_lines = 0
-    file_stats = defaultdict(dict)
+    if count_repo is not None and not verbose and exclude_regex is None and gitignore_spec is None:
+        # Only totals are needed and no path rules apply, so walk and count in C
+        line_totals = count_repo(os.fsencode(repo_dir),
+                                 {os.fsencode(ext): language_id
+                                  for ext, language_id in language_extensions.items()},
+                                 {os.fsencode(dir_name) for dir_name in EXCLUDE_DIRS},
+                                 len(LANGUAGES))
+        stats = {LANGUAGES[i]: lines for i, lines in enumerate(line_totals) if lines}
+        return stats, sum(line_totals)
+    
+    code_files = list(_iter_code_files(repo_dir, EXCLUDE_DIRS, exclude_regex,
+                                       language_extensions, gitignore_spec))
     
-    for root, dirs, files in os.walk(repo_dir):
-        # Skip excluded directories
-        dirs[:] = [
-            d for d in dirs if (
-                d not in exclude_dirs and 
-                not should_exclude_path(os.path.join(root, d), exclude_patterns, repo_dir, gitignore_spec)
-            )
-        ]
+    if not use_cache:
+        return _collect_stats(code_files, verbose)
+    
+    # Reuse line counts from previous runs on the same directory
+    line_count_cache = load_line_count_cache(repo_dir)
+    results = _collect_stats(code_files, verbose, line_count_cache)
+    save_line_count_cache(repo_dir, line_count_cache)
+    return results
+
+
+def list_tracked_files(repo_dir):
+    """Return the repo-relative paths of files tracked by git, or None if git fails."""
+    try:
+        output = subprocess.run(["git", "-C", repo_dir, "ls-files", "-z"],
+                                check=True,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    return [os.fsdecode(path) for path in output.split(b'\x00') if path]
+
+
+def get_language_stats_from_paths(repo_dir, paths, verbose=False, include_docs=False, exclude_patterns=None,
+                                  respect_gitignore=True):
+    """Calculate lines of code statistics by language for a list of repo-relative paths."""
+    language_extensions = get_language_extensions(include_docs)
+    exclude_regex = compile_exclude_patterns(exclude_patterns)
+    
+    # Tracked files can still match .gitignore (e.g. force-added ones); exclude them
+    # just like the tree walk does
+    gitignore_spec = None
+    if respect_gitignore:
+        gitignore_spec = parse_gitignore(repo_dir)
+        if gitignore_spec:
+            print("Using .gitignore rules to exclude files")
+    
+    code_files = []
+    
+    # Whether each directory is excluded, by repo-relative path; like the tree walk,
+    # a directory is excluded if any directory above it is
+    excluded_dirs = {'': False}
+    
+    def is_dir_excluded(rel_dir):
+        excluded = excluded_dirs.get(rel_dir)
+        if excluded is None:
+            parent_dir, _, dir_name = rel_dir.rpartition('/')
+            excluded = (is_dir_excluded(parent_dir) or
+                        dir_name in EXCLUDE_DIRS or
+                        should_exclude_path(rel_dir, exclude_regex, gitignore_spec))
+            excluded_dirs[rel_dir] = excluded
+        return excluded
+    
+    # Bind hot lookups to locals for the per-path loop
+    get_language = language_extensions.get
+    join = os.path.join
+    append = code_files.append
+    
+    for rel_path in paths:
+        # Skip files inside excluded directories
+        if is_dir_excluded(rel_path.rpartition('/')[0]):
+            continue
         
-        for file in files:
-            file_path = os.path.join(root, file)
-            
-            # Skip excluded files
-            if should_exclude_path(file_path, exclude_patterns, repo_dir, gitignore_spec):
-                continue
-                
-            _, ext = os.path.splitext(file)
-            
-            if ext in language_extensions:
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        line_count = sum(1 for _ in f)
-                        language = language_extensions[ext]
-                        stats[language] += line_count
-                        total_lines += line_count
-                        
-                        if verbose:
-                            # Get relative path from the repo root
-                            rel_path = os.path.relpath(file_path, repo_dir)
-                            file_stats[language][rel_path] = line_count
-                except Exception:
-                    # Skip files that can't be read
-                    pass
+        # Look up the extension directly; leading-dot names have none
+        name = rel_path.rpartition('/')[2]
+        dot = name.rfind('.')
+        if dot <= 0:
+            continue
+        language_id = get_language(name[dot:].lower())
+        if language_id is None:
+            continue
+        
+        # Skip excluded files
+        if should_exclude_path(rel_path, exclude_regex, gitignore_spec):
+            continue
+        
+        append((join(repo_dir, rel_path), rel_path, language_id))
     
-    if verbose:
-        return stats, total_lines, file_stats
-    return stats, total_lines
+    return _collect_stats(code_files, verbose)
 
 
-def print_stats(repo_path, stats, total_lines, verbose=False, file_stats=None, is_local=False):
+def print_stats(repo_path, stats, total_lines, verbose=False, file_stats=None, is_local=False, parsed_url=None):
     """Print the statistics in a formatted way."""
     # Extract repo name from URL or use the directory name for local paths
     if is_local:
         repo_name = os.path.basename(os.path.abspath(repo_path))
     else:
-        repo_name = repo_path.rstrip('/').split('/')[-2:]
-        repo_name = '/'.join(repo_name)
+        if parsed_url is None:
+            parsed_url = urlparse(repo_path)
+        owner, repo = [part for part in parsed_url.path.split('/') if part][:2]
+        repo_name = f"{owner}/{repo}"
     
-    print(f"\nRepository: {repo_name}")
-    print(f"Total Lines of Code: {total_lines:,}")
+    # Build the whole report and write it in one call
+    lines_out = [
+        f"\nRepository: {repo_name}\n",
+        f"Total Lines of Code: {total_lines:,}\n",
+    ]
     
     if total_lines > 0:
-        print("\nLanguage Breakdown:")
+        lines_out.append("\nLanguage Breakdown:\n")
         # Sort languages by lines of code (descending)
         sorted_stats = sorted(stats.items(), key=lambda x: x[1], reverse=True)
         
         for language, lines in sorted_stats:
             percentage = (lines / total_lines) * 100
-            print(f"{language:12} {lines:,} lines ({percentage:.1f}%)")
+            lines_out.append(f"{language:12} {lines:,} lines ({percentage:.1f}%)\n")
             
             if verbose and language in file_stats:
-                # Sort files by line count (descending)
-                sorted_files = sorted(file_stats[language].items(), key=lambda x: x[1], reverse=True)
+                # Select the largest files by line count (descending)
+                language_files = file_stats[language]
+                top_files = heapq.nlargest(10, language_files.items(), key=lambda x: x[1])
                 
                 # Print top files for this language (limited to top 10 for clarity)
-                print("\n  Top files:")
-                for file_path, file_lines in sorted_files[:10]:
+                lines_out.append("\n  Top files:\n")
+                for file_path, file_lines in top_files:
                     file_percentage = (file_lines / lines) * 100
-                    print(f"    {file_path:<50} {file_lines:,} lines ({file_percentage:.1f}%)")
+                    lines_out.append(f"    {file_path:<50} {file_lines:,} lines ({file_percentage:.1f}%)\n")
                 
                 # If there are more files, show a summary
-                if len(sorted_files) > 10:
-                    remaining = len(sorted_files) - 10
-                    print(f"    ... and {remaining} more files")
+                if len(language_files) > 10:
+                    remaining = len(language_files) - 10
+                    lines_out.append(f"    ... and {remaining} more files\n")
                 
-                print()  # Extra line for readability
+                lines_out.append("\n")  # Extra line for readability
+    
+    sys.stdout.write(''.join(lines_out))
 
 
 def main():
@@ -230,6 +726,8 @@ def main():
                         help="Analyze local directory instead of GitHub repository URL")
     parser.add_argument("--no-gitignore", action="store_true",
                         help="Don't respect .gitignore rules when analyzing local repositories")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't reuse or save cached line counts when analyzing local directories")
     args = parser.parse_args()
     
     repo_path = args.repo_path
@@ -238,6 +736,7 @@ def main():
     exclude_patterns = args.exclude
     is_local = args.local
     respect_gitignore = not args.no_gitignore
+    use_cache = not args.no_cache
     
     # Determine if it's a local path or if user explicitly specified local mode
     if is_local or is_local_path(repo_path):
@@ -253,7 +752,8 @@ def main():
             'verbose': verbose,
             'include_docs': include_docs,
             'exclude_patterns': exclude_patterns,
-            'respect_gitignore': respect_gitignore
+            'respect_gitignore': respect_gitignore,
+            'use_cache': use_cache
         }
         
         if verbose:
@@ -269,7 +769,8 @@ def main():
             repo_path = repo_path[1:]
         
         # Validate URL
-        if not validate_github_url(repo_path):
+        parsed_url = validate_github_url(repo_path)
+        if parsed_url is None:
             print("Error: Invalid GitHub repository URL")
             sys.exit(1)
         
@@ -290,12 +791,20 @@ def main():
                 'respect_gitignore': respect_gitignore
             }
             
+            # Enumerate tracked files from the git index instead of walking the clone
+            tracked_files = list_tracked_files(temp_dir)
+            if tracked_files is not None:
+                results = get_language_stats_from_paths(temp_dir, tracked_files, **stats_args)
+            else:
+                results = get_language_stats(temp_dir, **stats_args)
+            
             if verbose:
-                stats, total_lines, file_stats = get_language_stats(temp_dir, **stats_args)
-                print_stats(repo_path, stats, total_lines, verbose=True, file_stats=file_stats)
+                stats, total_lines, file_stats = results
+                print_stats(repo_path, stats, total_lines, verbose=True, file_stats=file_stats,
+                            parsed_url=parsed_url)
             else:
-                stats, total_lines = get_language_stats(temp_dir, **stats_args)
-                print_stats(repo_path, stats, total_lines)
+                stats, total_lines = results
+                print_stats(repo_path, stats, total_lines, parsed_url=parsed_url)
             
         finally:
             # Clean up the temporary directory